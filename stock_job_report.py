@@ -1,12 +1,18 @@
-import yfinance as yf
-import pandas as pd
+import numpy as np
+import jinja2
 import smtplib
-import requests
+import asyncio
+import atexit
+import aiohttp
+from aiolimiter import AsyncLimiter
+from curl_cffi import requests as cffi_requests
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
-import json
+from urllib.parse import quote
+import orjson
 import os
+import random
 import time
 
 # ========================
@@ -16,6 +22,27 @@ SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
 SENDER_PASSWORD = os.environ.get('SENDER_PASSWORD')
 RECIPIENT_EMAIL = os.environ.get('RECIPIENT_EMAIL')
 SERPAPI_KEY = os.environ.get('SERPAPI_KEY')  # Get free key from https://serpapi.com
+JOB_CONCURRENCY = 8   # Max simultaneous SerpAPI requests
+JOB_RATE_LIMIT = 30   # Max SerpAPI requests per minute
+
+# Reused across reports sent by the same process
+_SMTP = None
+
+# Reference data file, cached in memory and only rewritten when changed
+REFERENCES_FILE = 'references.json'
+_REFS = None
+_DIRTY = False
+
+# Shared HTTP session for Yahoo Finance (keep-alive + Chrome TLS fingerprint to avoid 429s)
+SESSION = cffi_requests.Session(impersonate="chrome")
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20  # Max symbols the spark endpoint accepts per request
+
+# Retry throttled/failed HTTP calls with exponential backoff instead of sleeping after every call
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1  # Seconds; doubled on each retry, plus up to this much random jitter
+MAX_RETRY_AFTER = 60  # Upper bound in seconds on a server-requested Retry-After wait
 
 # Define top stocks in each category
 TOP_STOCKS = {
@@ -24,6 +51,10 @@ TOP_STOCKS = {
     "Defense": ['LMT', 'RTX', 'BA', 'GD', 'NOC', 'HII', 'LHX', 'KBR', 'LDOS', 'BWXT']
 }
 
+# Flattened views of TOP_STOCKS, built once at import
+ALL_TICKERS = tuple(ticker for tickers in TOP_STOCKS.values() for ticker in tickers)
+TICKER_TO_SECTOR = {ticker: category for category, tickers in TOP_STOCKS.items() for ticker in tickers}
+
 # Mapping from ticker to company name
 COMPANY_NAMES = {
     'NVDA': 'NVIDIA',
@@ -58,73 +89,244 @@ COMPANY_NAMES = {
     'BWXT': 'BWX Technologies'
 }
 
+# SerpAPI LinkedIn job-search URL per ticker, built once at import (the API key is sent separately)
+JOB_URL_TEMPLATE = "https://serpapi.com/search?engine=linkedin_jobs&q={company}&location=Worldwide"
+JOB_URLS = {
+    ticker: JOB_URL_TEMPLATE.format(company=quote(COMPANY_NAMES.get(ticker, ticker)))
+    for ticker in ALL_TICKERS
+}
+
+# ========================
+# EMAIL TEMPLATE
+# ========================
+# Static head (styles) and closing tags, emitted as-is around the rendered body
+HTML_PREFIX = """
+    <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; }
+                h2 { color: #1a0dab; }
+                h3 { color: #174ea6; border-bottom: 1px solid #eee; padding-bottom: 5px; }
+                table { border-collapse: collapse; width: 100%; margin-bottom: 20px; }
+                th { background-color: #f2f2f2; text-align: left; padding: 12px; font-weight: bold; }
+                td { padding: 10px; border-bottom: 1px solid #ddd; }
+                tr:hover { background-color: #f5f5f5; }
+                .positive { color: green; font-weight: bold; }
+                .negative { color: red; font-weight: bold; }
+                .section { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+                .note { color: #666; font-size: 0.9em; margin-top: 20px; }
+                .info-banner { background-color: #e3f2fd; padding: 10px; border-radius: 5px; margin-bottom: 15px; }
+            </style>
+        </head>
+        <body>
+"""
+HTML_SUFFIX = """
+        </body>
+    </html>
+"""
+
+REPORT_TEMPLATE = jinja2.Template("""
+            <h2>📊 {{ '10-Day' if has_job_data else 'Daily' }} Investment Report ({{ today }})</h2>
+            {% if has_job_data %}
+            <div class="info-banner">
+                💡 <strong>Comprehensive Report:</strong> Includes job market data (updated every 10 days)
+            </div>
+            {% else %}
+            <div class="info-banner">
+                ⏳ <strong>Stock-Only Update:</strong> Job market data will refresh in next 10-day report
+            </div>
+            {% endif %}
+            <div class="section">
+                <h3>📈 Stock Performance Analysis</h3>
+                <p>Reference prices are locked from initial run date. Daily changes show performance vs this reference.</p>
+                {% for category, rows in stock_report.items() %}
+                <h4>🔧 {{ category }} Sector</h4>
+                <table>
+                    <thead>
+                        <tr><th>Symbol</th><th>Current Price</th><th>Change vs Reference</th><th>Daily Change</th></tr>
+                    </thead>
+                    <tbody>
+                        {% for row in rows %}
+                        <tr><td>{{ row.symbol }}</td><td>{{ row.price }}</td><td><span class="{{ row.ref_class }}">{{ row.ref_change }}</span></td><td><span class="{{ row.daily_class }}">{{ row.daily_change }}</span></td></tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+                <br>
+                {% endfor %}
+            </div>
+            {% if has_job_data %}
+            <div class="section">
+                <h3>💼 Job Market Trends (10-Day Update)</h3>
+                <p>Hiring activity as an indicator of company growth and investment potential</p>
+                {% for sector, rows in job_report.items() %}
+                <h4>👔 {{ sector }} Sector Job Openings</h4>
+                <table>
+                    <thead>
+                        <tr><th>Company</th><th>Current Jobs</th><th>Change vs Reference</th></tr>
+                    </thead>
+                    <tbody>
+                        {% for row in rows %}
+                        <tr><td>{{ row.company }}</td><td>{{ row.jobs }}</td><td><span class="{{ row.ref_class }}">{{ row.ref_change }}</span></td></tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+                <br>
+                {% endfor %}
+            </div>
+            {% endif %}
+            <div class="note">
+                <p><strong>Report Frequency:</strong></p>
+                <ul>
+                    <li>Stock data updated daily</li>
+                    <li>Job market data updated every 10 days</li>
+                    <li>Next comprehensive report: {{ next_report_date }}</li>
+                </ul>
+                <p>Note: Job data from LinkedIn via SerpAPI | Stock data from Yahoo Finance</p>
+            </div>
+""")
+
 # ========================
 # FUNCTIONS
 # ========================
-def get_stock_data(ticker):
-    """Fetch current stock data using Yahoo Finance"""
-    stock = yf.Ticker(ticker)
-    try:
-        data = stock.history(period='1d')
+def retry_delay(attempt, retry_after=None):
+    """Seconds to wait before retrying: the server's Retry-After if given, else backoff with jitter"""
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        except ValueError:
+            pass  # HTTP-date form, fall back to backoff
+    return BACKOFF_FACTOR * 2 ** attempt + random.uniform(0, BACKOFF_FACTOR)
+
+def get_with_retry(url, params):
+    """GET from the shared session, retrying on connection errors and 429/5xx responses"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = SESSION.get(url, params=params)
+        except cffi_requests.RequestsError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(retry_delay(attempt))
+            continue
         
-        if data.empty:
-            data = stock.history(period='5d').tail(1)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        time.sleep(retry_delay(attempt, response.headers.get('Retry-After')))
+
+def fetch_spark(tickers):
+    """Fetch daily close series from Yahoo's spark endpoint, batching symbols per request"""
+    spark = {}
+    for i in range(0, len(tickers), SPARK_BATCH_SIZE):
+        batch = tickers[i:i + SPARK_BATCH_SIZE]
+        params = {
+            "symbols": ",".join(batch),
+            "range": "1d",
+            "interval": "1d",
+            "indicators": "close"
+        }
+        
+        try:
+            response = get_with_retry(SPARK_URL, params)
+            response.raise_for_status()
+            spark.update(response.json())
+        except Exception as e:
+            print(f"Error fetching stock data for {', '.join(batch)}: {str(e)}")
+    return spark
+
+def get_stock_data(tickers):
+    """Fetch current price and daily change for all tickers from Yahoo Finance"""
+    spark = fetch_spark(tickers)
+    stock_data = {}
+    
+    for ticker in tickers:
+        data = spark.get(ticker)
+        if not data:
+            continue  # Batch failed (already reported) or symbol unknown to Yahoo
         
-        if not data.empty:
-            current_price = data['Close'][-1]
-            previous_close = data['Close'][0] if len(data) > 1 else current_price
+        try:
+            closes = [close for close in data.get('close') or [] if close is not None]
+            if not closes:
+                continue
+            
+            current_price = closes[-1]
+            previous_close = data.get('chartPreviousClose') or current_price
             daily_change = ((current_price - previous_close) / previous_close) * 100
             
-            return {
+            stock_data[ticker] = {
                 'symbol': ticker,
                 'price': current_price,
                 'daily_change': daily_change
             }
-    except Exception as e:
-        print(f"Error fetching stock data for {ticker}: {str(e)}")
-    return None
+        except Exception as e:
+            print(f"Error fetching stock data for {ticker}: {str(e)}")
+    return stock_data
 
-def get_job_openings(company_name):
-    """Get current job openings using SerpApi"""
-    try:
-        params = {
-            "engine": "linkedin_jobs",
-            "q": company_name,
-            "location": "Worldwide",
-            "api_key": SERPAPI_KEY
-        }
-        
-        response = requests.get("https://serpapi.com/search", params=params)
-        data = response.json()
-        
-        if "error" in data:
-            print(f"SerpAPI error for {company_name}: {data['error']}")
-            return 0
+async def fetch_jobs(session, sem, limiter, ticker):
+    """Get current job openings for one company using SerpApi"""
+    company_name = COMPANY_NAMES.get(ticker, ticker)
+    params = {"api_key": SERPAPI_KEY} if SERPAPI_KEY else None
+    
+    async with sem:
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    async with limiter:
+                        async with session.get(JOB_URLS[ticker], params=params) as response:
+                            if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                                data = orjson.loads(await response.read())
+                                break
+                            delay = retry_delay(attempt, response.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if attempt == MAX_RETRIES:
+                        raise
+                    delay = retry_delay(attempt)
+                await asyncio.sleep(delay)
             
-        # Get job count from API response
-        if "jobs_results" in data:
-            return len(data["jobs_results"])
-        elif "search_parameters" in data:
-            return data["search_parameters"].get("filters", {}).get("jobs_search_result_count", 0)
-    except Exception as e:
-        print(f"Error fetching jobs for {company_name}: {str(e)}")
+            if "error" in data:
+                print(f"SerpAPI error for {company_name}: {data['error']}")
+                return 0
+                
+            # Get job count from API response
+            if "jobs_results" in data:
+                return len(data["jobs_results"])
+            elif "search_parameters" in data:
+                return data["search_parameters"].get("filters", {}).get("jobs_search_result_count", 0)
+        except Exception as e:
+            print(f"Error fetching jobs for {company_name}: {str(e)}")
     return 0
 
+async def gather_jobs(tickers):
+    """Fetch job openings for all companies concurrently, bounded and rate limited"""
+    sem = asyncio.Semaphore(JOB_CONCURRENCY)
+    limiter = AsyncLimiter(JOB_RATE_LIMIT, 60)
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(*[fetch_jobs(session, sem, limiter, ticker) for ticker in tickers])
+
 def load_references():
-    """Load reference data from file"""
-    if os.path.exists('references.json'):
-        with open('references.json', 'r') as f:
-            return json.load(f)
-    return {
-        'stock_references': {},
-        'job_references': {},
-        'last_report_date': None
-    }
+    """Load reference data from file (read once, then served from memory)"""
+    global _REFS
+    if _REFS is None:
+        if os.path.exists(REFERENCES_FILE):
+            with open(REFERENCES_FILE, 'rb') as f:
+                _REFS = orjson.loads(f.read())
+        else:
+            _REFS = {
+                'stock_references': {},
+                'job_references': {},
+                'last_report_date': None
+            }
+    return _REFS
 
-def save_references(references):
-    """Save reference data to file"""
-    with open('references.json', 'w') as f:
-        json.dump(references, f)
+def save_references():
+    """Atomically save reference data to file, only if it changed"""
+    global _DIRTY
+    if not _DIRTY:
+        return
+    
+    tmp_path = REFERENCES_FILE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(_REFS, option=orjson.OPT_SERIALIZE_NUMPY))
+    os.replace(tmp_path, REFERENCES_FILE)
+    _DIRTY = False
 
 def should_generate_job_report(references):
     """Determine if we should generate job report based on last run date"""
@@ -134,79 +336,121 @@ def should_generate_job_report(references):
     last_date = datetime.strptime(references['last_report_date'], "%Y-%m-%d")
     return (datetime.now() - last_date).days >= 10
 
+def change_classes(changes):
+    """CSS class for each percentage change, by sign"""
+    return np.where(changes >= 0, 'positive', 'negative')
+
 def generate_report():
     """Generate performance report"""
+    global _DIRTY
     references = load_references()
     today = datetime.now().strftime("%Y-%m-%d")
-    
-    stock_report = {}
-    job_report = {}
-    new_references = False
     generate_jobs = should_generate_job_report(references)
 
     # Process stock data (always generated)
-    for category, tickers in TOP_STOCKS.items():
-        category_data = []
-        
-        for ticker in tickers:
-            stock_data = get_stock_data(ticker)
-            if not stock_data:
-                continue
-                
-            current_price = stock_data['price']
-            ref_key = f"{ticker}_reference"
-            
-            if ref_key not in references['stock_references']:
-                references['stock_references'][ref_key] = current_price
-                new_references = True
-                
-            ref_price = references['stock_references'][ref_key]
-            ref_change = ((current_price - ref_price) / ref_price) * 100
-            
-            category_data.append({
-                'Symbol': ticker,
-                'Current Price': f"${current_price:.2f}",
-                'Change vs Reference': f"{ref_change:+.2f}%",
-                'Daily Change': f"{stock_data['daily_change']:+.2f}%"
-            })
-        
-        stock_report[category] = pd.DataFrame(category_data)
+    stocks = get_stock_data(ALL_TICKERS)
+    stock_refs = references['stock_references']
+    symbols = [ticker for ticker in ALL_TICKERS if ticker in stocks]
+    
+    for ticker in symbols:
+        ref_key = f"{ticker}_reference"
+        if ref_key not in stock_refs:
+            stock_refs[ref_key] = float(stocks[ticker]['price'])
+            _DIRTY = True
+    
+    prices = np.array([stocks[ticker]['price'] for ticker in symbols], dtype=float)
+    ref_prices = np.array([stock_refs[f"{ticker}_reference"] for ticker in symbols], dtype=float)
+    daily_changes = np.array([stocks[ticker]['daily_change'] for ticker in symbols], dtype=float)
+    ref_changes = (prices - ref_prices) / ref_prices * 100
+    
+    # Build each sector's table rows directly, formatting and classing all values in one pass
+    stock_report = {category: [] for category in TOP_STOCKS}
+    rows = zip(symbols, np.char.mod("$%.2f", prices),
+               np.char.mod("%+.2f%%", ref_changes), change_classes(ref_changes),
+               np.char.mod("%+.2f%%", daily_changes), change_classes(daily_changes))
+    for symbol, price, ref_change, ref_class, daily_change, daily_class in rows:
+        stock_report[TICKER_TO_SECTOR[symbol]].append({
+            'symbol': symbol,
+            'price': price,
+            'ref_change': ref_change,
+            'ref_class': ref_class,
+            'daily_change': daily_change,
+            'daily_class': daily_class
+        })
     
     # Process job data (only every 10 days)
-    job_data = []
+    job_report = None
     if generate_jobs:
         references['last_report_date'] = today
-        new_references = True
+        _DIRTY = True
         
-        for category, tickers in TOP_STOCKS.items():
-            for ticker in tickers:
-                company_name = COMPANY_NAMES.get(ticker, ticker)
-                current_jobs = get_job_openings(company_name)
-                
-                if ticker not in references['job_references']:
-                    references['job_references'][ticker] = current_jobs
-                    new_references = True
-                    
-                ref_jobs = references['job_references'][ticker]
-                job_change = ((current_jobs - ref_jobs) / ref_jobs) * 100 if ref_jobs > 0 else 0
-                
-                job_data.append({
-                    'Sector': category,
-                    'Company': company_name,
-                    'Current Jobs': current_jobs,
-                    'Change vs Reference': f"{job_change:+.2f}%"
-                })
-                
-                # Add delay to avoid rate limiting
-                time.sleep(1)
-    
-    job_report = pd.DataFrame(job_data) if job_data else None
+        companies = [COMPANY_NAMES.get(ticker, ticker) for ticker in ALL_TICKERS]
+        job_counts = asyncio.run(gather_jobs(ALL_TICKERS))
+        job_refs = references['job_references']
+        
+        for ticker, current_jobs in zip(ALL_TICKERS, job_counts):
+            if ticker not in job_refs:
+                job_refs[ticker] = current_jobs
+                _DIRTY = True
+        
+        jobs_now = np.array(job_counts, dtype=float)
+        ref_jobs = np.array([job_refs[ticker] for ticker in ALL_TICKERS], dtype=float)
+        job_changes = np.divide(jobs_now - ref_jobs, ref_jobs,
+                                out=np.zeros_like(jobs_now), where=ref_jobs > 0) * 100
+        
+        job_report = {category: [] for category in TOP_STOCKS}
+        rows = zip(ALL_TICKERS, companies, job_counts,
+                   np.char.mod("%+.2f%%", job_changes), change_classes(job_changes))
+        for ticker, company, jobs, ref_change, ref_class in rows:
+            job_report[TICKER_TO_SECTOR[ticker]].append({
+                'company': company,
+                'jobs': jobs,
+                'ref_change': ref_change,
+                'ref_class': ref_class
+            })
     
-    if new_references:
-        save_references(references)
+    save_references()
     
     return stock_report, job_report, generate_jobs
 
+def get_smtp():
+    """Return a logged-in SMTP connection, reusing the previous one while it is still alive"""
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            if _SMTP.noop()[0] == 250:
+                return _SMTP
+        except (smtplib.SMTPException, OSError):
+            pass
+        
+        try:
+            _SMTP.close()
+        except Exception:
+            pass
+        _SMTP = None
+    
+    # Only cache the connection once it is authenticated
+    server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+    try:
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    _SMTP = server
+    return _SMTP
+
+def close_smtp():
+    """Send QUIT on the cached SMTP connection, if any (runs at interpreter exit)"""
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            _SMTP.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        _SMTP = None
+
+atexit.register(close_smtp)
+
 def send_report(stock_report, job_report, has_job_data):
     """Send report via email"""
     today = datetime.now().strftime("%B %d, %Y")
@@ -220,113 +464,22 @@ def send_report(stock_report, job_report, has_job_data):
     else:
         msg['Subject'] = f"Daily Stock Update - {today}"
     
-    # Create HTML content
-    html = f"""
-    <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; }}
-                h2 {{ color: #1a0dab; }}
-                h3 {{ color: #174ea6; border-bottom: 1px solid #eee; padding-bottom: 5px; }}
-                table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
-                th {{ background-color: #f2f2f2; text-align: left; padding: 12px; font-weight: bold; }}
-                td {{ padding: 10px; border-bottom: 1px solid #ddd; }}
-                tr:hover {{ background-color: #f5f5f5; }}
-                .positive {{ color: green; font-weight: bold; }}
-                .negative {{ color: red; font-weight: bold; }}
-                .section {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                .note {{ color: #666; font-size: 0.9em; margin-top: 20px; }}
-                .info-banner {{ background-color: #e3f2fd; padding: 10px; border-radius: 5px; margin-bottom: 15px; }}
-            </style>
-        </head>
-        <body>
-            <h2>📊 {'10-Day' if has_job_data else 'Daily'} Investment Report ({today})</h2>
-    """
-    
-    if has_job_data:
-        html += """
-            <div class="info-banner">
-                💡 <strong>Comprehensive Report:</strong> Includes job market data (updated every 10 days)
-            </div>
-        """
-    else:
-        html += """
-            <div class="info-banner">
-                ⏳ <strong>Stock-Only Update:</strong> Job market data will refresh in next 10-day report
-            </div>
-        """
-    
-    html += """
-            <div class="section">
-                <h3>📈 Stock Performance Analysis</h3>
-                <p>Reference prices are locked from initial run date. Daily changes show performance vs this reference.</p>
-    """
-    
-    for category, df in stock_report.items():
-        df['Change vs Reference'] = df['Change vs Reference'].apply(
-            lambda x: f'<span class="{"positive" if "+" in x else "negative"}">{x}</span>')
-        df['Daily Change'] = df['Daily Change'].apply(
-            lambda x: f'<span class="{"positive" if "+" in x else "negative"}">{x}</span>')
-        
-        html += f"""
-        <h4>🔧 {category} Sector</h4>
-        {df.to_html(index=False, border=0, justify='left', escape=False)}
-        <br>
-        """
-    
-    html += """
-            </div>
-    """
-    
-    if has_job_data:
-        html += """
-            <div class="section">
-                <h3>💼 Job Market Trends (10-Day Update)</h3>
-                <p>Hiring activity as an indicator of company growth and investment potential</p>
-        """
-        
-        # Format job report with sector grouping
-        for sector in job_report['Sector'].unique():
-            sector_jobs = job_report[job_report['Sector'] == sector]
-            sector_jobs = sector_jobs.drop(columns=['Sector'])
-            
-            sector_jobs['Change vs Reference'] = sector_jobs['Change vs Reference'].apply(
-                lambda x: f'<span class="{"positive" if "+" in x else "negative"}">{x}</span>')
-            
-            html += f"""
-            <h4>👔 {sector} Sector Job Openings</h4>
-            {sector_jobs.to_html(index=False, border=0, justify='left', escape=False)}
-            <br>
-            """
-        
-        html += """
-            </div>
-        """
-    
-    html += """
-            <div class="note">
-                <p><strong>Report Frequency:</strong></p>
-                <ul>
-                    <li>Stock data updated daily</li>
-                    <li>Job market data updated every 10 days</li>
-                    <li>Next comprehensive report: {next_report_date}</li>
-                </ul>
-                <p>Note: Job data from LinkedIn via SerpAPI | Stock data from Yahoo Finance</p>
-            </div>
-        </body>
-    </html>
-    """
-    
     # Calculate next report date
     next_date = (datetime.now() + timedelta(days=10)).strftime("%B %d, %Y")
-    html = html.replace("{next_report_date}", next_date)
+    
+    body = REPORT_TEMPLATE.render(
+        today=today,
+        has_job_data=has_job_data,
+        stock_report=stock_report,
+        job_report=job_report,
+        next_report_date=next_date
+    )
+    html = "".join([HTML_PREFIX, body, HTML_SUFFIX])
     
     msg.attach(MIMEText(html, 'html'))
     
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, RECIPIENT_EMAIL, msg.as_string())
+        get_smtp().sendmail(SENDER_EMAIL, RECIPIENT_EMAIL, msg.as_string())
         print(f"Report email sent successfully! {'(With jobs)' if has_job_data else '(Stocks only)'}")
     except Exception as e:
         print(f"Error sending email: {str(e)}")
@@ -335,15 +488,6 @@ def send_report(stock_report, job_report, has_job_data):
 # MAIN EXECUTION
 # ========================
 if __name__ == "__main__":
-    # Install required packages
-    try:
-        import yfinance
-        import pandas
-        import requests
-    except ImportError:
-        import subprocess
-        subprocess.run(["pip", "install", "yfinance", "pandas", "requests"])
-    
     print("Generating investment report...")
     stock_report, job_report, has_job_data = generate_report()
     print("Sending email report...")